@@ -1,8 +1,11 @@
 import random
-from math import log, log2, ceil
+from math import log2
 
-from tools.hash_function import pick_k_ind_hash_function
+from tools.fixed_base_power import get_fixed_base_table, fixed_base_pow
+from tools.hash_function import pick_k_ind_hash_function, splitmix64
 from tools.primality_test import prime_getter
+from tools.sampling import pick_random_item
+from tools.validation import check_type, check_in_range
 
 
 class L0Sampler:
@@ -30,11 +33,12 @@ class L0Sampler:
             https://pdfs.semanticscholar.org/b0f3/336c82b8a9d9a70d7cf187eea3f6dbfd1cdf.pdf
     """
 
-    __slots__ = 'init_seed', 'n_hash_power', 'n', 'n_sq', 'levels', 'eps', 'delta', 'sparse_degree', 'k',\
-                'hash_function', 'delta_r', 'recoverers_values', 'recoverers_values_tmp', 'recoverers_rows',\
-                'recoverers_columns', 'recoverers_column_hash_params', 'prime_after_n', 'one_sp_rec_p'
+    __slots__ = 'init_seed', 'n_hash_power', 'hash_range', 'n', 'levels', 'eps', 'delta', 'sparse_degree',\
+                'k', 'hash_function', 'delta_r', 'recoverers_iota', 'recoverers_fi', 'recoverers_tau',\
+                'recoverers_rows', 'recoverers_columns', 'recoverers_column_hash_params', 'prime_after_n',\
+                'one_sp_rec_p', 'one_sp_rec_z', 'one_sp_rec_z_powers', 'validate'
 
-    def __init__(self, n, delta=-1, init_seed=-1):
+    def __init__(self, n, delta=-1, init_seed=-1, validate=False):
         """
 
         Time Complexity:
@@ -47,6 +51,9 @@ class L0Sampler:
         :param init_seed:   l0-samplers that are initialized with the same value of
                             init_seed will have the same random parameters.
         :type init_seed:    int
+        :param validate:    If True, check type and range of every update. Off by default
+                            since update is the hot path.
+        :type validate:     bool
         """
 
         if delta == -1:
@@ -56,13 +63,15 @@ class L0Sampler:
             init_seed = random.getrandbits(32)
         random.seed(init_seed)
         self.init_seed = init_seed
+        self.validate = validate
 
         # for more accurate distribution among levels one may want to increase this value
         self.n_hash_power = 1
 
         self.n = n
-        self.n_sq = n*n
-        self.levels = ceil(log2(self.n))
+        self.hash_range = n ** self.n_hash_power
+        # equals ceil(log2(n)) for n > 1, without floating point rounding
+        self.levels = (n - 1).bit_length()
 
         self.eps = delta
         self.delta = delta
@@ -71,41 +80,65 @@ class L0Sampler:
         # self.sparse_degree = ceil(2*(log2(1 / self.delta)))
         self.sparse_degree = 2*self.k
 
-        self.hash_function = pick_k_ind_hash_function(n, n ** self.n_hash_power, self.k)
+        self.hash_function = pick_k_ind_hash_function(n, self.hash_range, self.k)
 
         # s-sparse recoverers initialization
         self.delta_r = self.delta
-        self.recoverers_values = {}
-        self.recoverers_values_tmp = {}
         # self.recoverers_rows = int(log2(self.sparse_degree / self.delta_r))
         self.recoverers_rows = 4
         self.recoverers_columns = 2 * self.sparse_degree
 
-        # parameters to hash function that hashes update index into some column
-        self.recoverers_column_hash_params = {}
+        # counters of 1-sparse recoverer (level, row, column) are stored in
+        # recoverers_iota[cell], recoverers_fi[cell] and recoverers_tau[cell],
+        # where cell = (level * rows + row) * columns + column
+        self.recoverers_iota = self.get_empty_recoverers_table()
+        self.recoverers_fi = self.get_empty_recoverers_table()
+        self.recoverers_tau = self.get_empty_recoverers_table()
 
         # prime larger than n
         self.prime_after_n = prime_getter.get_next_prime(n)
 
+        # parameters to hash function that hashes update index into some column,
+        # recoverers_column_hash_params[level][row] = (a, b)
+        self.recoverers_column_hash_params = tuple(
+            tuple(self.get_recoverers_column_hash_params(level, row) for row in range(self.recoverers_rows))
+            for level in range(self.levels))
+
         # prime for ring Z_p from which we choose z in 1-sparse recoverers
         self.one_sp_rec_p = prime_getter.get_next_prime(n*100)
 
-    def get_one_sp_rec_z(self, level, row, column):
+        # z is shared by all 1-sparse recoverers of a level, so z**(i + 1) is computed
+        # once per level on update. Each of them still falsely reports 1-sparse vector
+        # with probability at most n/p.
+        self.one_sp_rec_z = tuple(self.get_one_sp_rec_z(level) for level in range(self.levels))
+        # tables of powers of z, as update only needs z**(i + 1) for i < n
+        self.one_sp_rec_z_powers = tuple(get_fixed_base_table(z, self.one_sp_rec_p, n) for z in self.one_sp_rec_z)
+
+    def get_empty_recoverers_table(self):
+        """
+            Returns table of zero counters, one for every 1-sparse recoverer.
+
+        :return:    List of size levels * rows * columns.
+        :rtype:     list
         """
-            Returns z for 1-sparse recoverer.
+
+        return [0] * (self.levels * self.recoverers_rows * self.recoverers_columns)
+
+    def get_one_sp_rec_z(self, level):
+        """
+            Returns z for 1-sparse recoverers of the level.
+
+            Derived from init_seed with SplitMix64, so l0-samplers with the
+            same init_seed get the same values. (For p > 2**64 z is chosen
+            among first 2**64 elements of Z_p.)
 
         :param level:   l0-sampler level.
         :type level:    int
-        :param row:     Row number of s-sparse recoverer.
-        :type row:      int
-        :param column:  Column of s-sparse recoverer.
-        :type column:   int
-        :return:        Value z that is used to initialize 1-sparse recoverer.
+        :return:        Value z that is used to initialize 1-sparse recoverers.
         :rtype:         int
         """
 
-        random.seed((level*self.n_sq + row*self.n + column) ^ self.init_seed)
-        return random.randint(1, self.one_sp_rec_p - 1)
+        return 1 + splitmix64(self.init_seed, level) % (self.one_sp_rec_p - 1)
 
     def get_recoverers_column_hash_params(self, level, row):
         """
@@ -120,8 +153,10 @@ class L0Sampler:
         :rtype:         tuple
         """
 
-        random.seed((level*self.n + row) ^ self.init_seed)
-        return random.randint(1, self.prime_after_n - 1), random.randint(0, self.prime_after_n - 1)
+        # outputs 0, ..., levels - 1 of the generator are taken by z
+        k = self.levels + 2 * (level * self.recoverers_rows + row)
+        return 1 + splitmix64(self.init_seed, k) % (self.prime_after_n - 1),\
+            splitmix64(self.init_seed, k + 1) % self.prime_after_n
 
     def get_column(self, level, row, i):
         """
@@ -136,7 +171,7 @@ class L0Sampler:
         :rtype:         int
         """
 
-        a = self.recoverers_column_hash_params[(level, row)]
+        a = self.recoverers_column_hash_params[level][row]
         return ((i * a[0] + a[1]) % self.prime_after_n) % self.recoverers_columns
 
     def update(self, i, Delta):
@@ -154,26 +189,70 @@ class L0Sampler:
         :rtype:         None
         """
 
+        if self.validate:
+            check_type(i, int)
+            check_type(Delta, int)
+            check_in_range(0, self.n - 1, i)
+
+        # i is put into levels l such that hash_value <= max_hash_value >> l,
+        # i.e. hash_value << l <= max_hash_value, and there are max_l of them
         hash_value = self.hash_function(i)
-        n_copy = self.n ** self.n_hash_power - 1
-        max_l = 0
-        while n_copy >= hash_value and max_l < self.levels:
+        max_hash_value = self.hash_range - 1
+        max_l = max_hash_value.bit_length() - hash_value.bit_length()
+        if hash_value << max_l <= max_hash_value:
             max_l += 1
-            n_copy >>= 1
-
+        if max_l > self.levels:
+            max_l = self.levels
+
+        # attributes are bound to locals since this loop is the hot path
+        columns = self.recoverers_columns
+        prime_after_n = self.prime_after_n
+        p = self.one_sp_rec_p
+        z_powers = self.one_sp_rec_z_powers
+        column_hash_params = self.recoverers_column_hash_params
+        recoverers_iota = self.recoverers_iota
+        recoverers_fi = self.recoverers_fi
+        recoverers_tau = self.recoverers_tau
+        iota_delta = (i + 1) * Delta
+
+        row_offset = 0
         for level in range(max_l):
-            for row in range(self.recoverers_rows):
-                if (level, row) not in self.recoverers_column_hash_params:
-                    self.recoverers_column_hash_params[(level, row)] = self.get_recoverers_column_hash_params(level, row)
-                column = self.get_column(level, row, i)
+            z_power = fixed_base_pow(z_powers[level], i + 1, p)
+
+            for a in column_hash_params[level]:
+                cell = row_offset + ((i * a[0] + a[1]) % prime_after_n) % columns
+
+                recoverers_iota[cell] += iota_delta
+                recoverers_fi[cell] += Delta
+                recoverers_tau[cell] = (recoverers_tau[cell] + Delta * z_power) % p
+
+                row_offset += columns
 
-                if (level, row, column) not in self.recoverers_values:
-                    self.recoverers_values[(level, row, column)] = [self.get_one_sp_rec_z(level, row, column), 0, 0, 0]
+    def update_batch(self, indexes, Deltas):
+        """
+            Series of updates of type a_i += Delta, one for every pair
+            (i, Delta) from indexes and Deltas.
+
+            Updates are applied one by one with update. If one of them
+            fails validation, the updates before it stay applied.
+
+            Time Complexity
+                O(len(indexes) * log(n)**3)
+
+        :param indexes: Indexes of updates.
+        :type indexes:  sequence of int
+        :param Deltas:  Values of updates.
+        :type Deltas:   sequence of int
+        :return:
+        :rtype:         None
+        """
 
-                recoverer = self.recoverers_values[(level, row, column)]
-                recoverer[1] += (i + 1) * Delta
-                recoverer[2] += Delta
-                recoverer[3] = (recoverer[3] + Delta * pow(recoverer[0], i + 1, self.one_sp_rec_p)) % self.one_sp_rec_p
+        # checked before any update, so batch of mismatched lengths leaves the sketch unchanged
+        if len(indexes) != len(Deltas):
+            raise ValueError('indexes and Deltas must have the same length')
+
+        for i, Delta in zip(indexes, Deltas):
+            self.update(i, Delta)
 
     def get_sample(self):
         """
@@ -190,35 +269,7 @@ class L0Sampler:
         if len(samples) == 0:
             return None
         else:
-            i = random.choice(list(samples.keys()))
-            val = samples[i]
-
-            return i, val
-
-        # result = None
-        # result_hash = 2*(self.n**self.n_hash_power)
-        #
-        # for level in range(self.levels):
-        #     for row in range(self.recoverers_rows):
-        #         for column in range(self.recoverers_columns):
-        #             if (level, row, column) not in self.recoverers_values:
-        #                 continue
-        #
-        #             recoverer = self.recoverers_values[(level, row, column)]
-        #
-        #             z = recoverer[0]
-        #             iota = recoverer[1]
-        #             fi = recoverer[2]
-        #             tau = recoverer[3]
-        #
-        #             if fi != 0 and iota % fi == 0 and iota // fi > 0 and \
-        #                             tau == fi * pow(z, iota // fi, self.one_sp_rec_p) % self.one_sp_rec_p:
-        #                 index = iota // fi - 1
-        #                 value = fi
-        #                 if self.hash_function(index) < result_hash:
-        #                     result = index, value
-        #
-        # return result
+            return pick_random_item(samples)
 
     def get_samples(self):
         """
@@ -232,23 +283,17 @@ class L0Sampler:
         """
 
         result = {}
-
-        for level in range(self.levels):
-            for row in range(self.recoverers_rows):
-                for column in range(self.recoverers_columns):
-                    if (level, row, column) not in self.recoverers_values:
-                        continue
-
-                    recoverer = self.recoverers_values[(level, row, column)]
-
-                    z = recoverer[0]
-                    iota = recoverer[1]
-                    fi = recoverer[2]
-                    tau = recoverer[3]
-
-                    if fi != 0 and iota % fi == 0 and iota // fi > 0 and \
-                            tau == fi * pow(z, iota // fi, self.one_sp_rec_p) % self.one_sp_rec_p:
-                        result[iota // fi - 1] = fi
+        n = self.n
+        p = self.one_sp_rec_p
+        z_powers = self.one_sp_rec_z_powers
+        level_size = self.recoverers_rows * self.recoverers_columns
+
+        for cell, (iota, fi, tau) in enumerate(zip(self.recoverers_iota, self.recoverers_fi, self.recoverers_tau)):
+            # only indexes 0 <= iota/fi - 1 < n can be recovered, thus the table
+            # of powers of z covers every exponent that gets here
+            if fi != 0 and iota % fi == 0 and 0 < iota // fi <= n and \
+                    tau == fi * fixed_base_pow(z_powers[cell // level_size], iota // fi, p) % p:
+                result[iota // fi - 1] = fi
 
         return result
 
@@ -274,20 +319,13 @@ class L0Sampler:
            self.init_seed != another_l0_sampler.init_seed:
             raise ValueError('samplers are not initialized from the same random bits')
 
-        for key, another_recoverer in another_l0_sampler.recoverers_values.items():
-            level = key[0]
-            row = key[1]
-            column = key[2]
-
-            if (level, row, column) not in self.recoverers_values:
-                self.recoverers_values[(level, row, column)] = [self.get_one_sp_rec_z(level, row, column), 0, 0, 0]
-            recoverer = self.recoverers_values[(level, row, column)]
+        if self.one_sp_rec_z != another_l0_sampler.one_sp_rec_z:
+            raise ValueError('1-sparse recoverers are not compatible')
 
-            if recoverer[0] != another_recoverer[0]:
-                raise ValueError('1-sparse recoverers are not compatible')
-            recoverer[1] += another_recoverer[1]
-            recoverer[2] += another_recoverer[2]
-            recoverer[3] = (recoverer[3] + another_recoverer[3]) % self.one_sp_rec_p
+        p = self.one_sp_rec_p
+        self.recoverers_iota = [x + y for x, y in zip(self.recoverers_iota, another_l0_sampler.recoverers_iota)]
+        self.recoverers_fi = [x + y for x, y in zip(self.recoverers_fi, another_l0_sampler.recoverers_fi)]
+        self.recoverers_tau = [(x + y) % p for x, y in zip(self.recoverers_tau, another_l0_sampler.recoverers_tau)]
 
     def subtract(self, another_l0_sampler):
         """
@@ -311,17 +349,10 @@ class L0Sampler:
            self.init_seed != another_l0_sampler.init_seed:
             raise ValueError('samplers are not initialized from the same random bits')
 
-        for (key, another_recoverer) in another_l0_sampler.recoverers_values.items():
-            level = key[0]
-            row = key[1]
-            column = key[2]
-
-            if (level, row, column) not in self.recoverers_values:
-                self.recoverers_values[(level, row, column)] = [self.get_one_sp_rec_z(level, row, column), 0, 0, 0]
-            recoverer = self.recoverers_values[(level, row, column)]
+        if self.one_sp_rec_z != another_l0_sampler.one_sp_rec_z:
+            raise ValueError('1-sparse recoverers are not compatible')
 
-            if recoverer[0] != another_recoverer[0]:
-                raise ValueError('1-sparse recoverers are not compatible')
-            recoverer[1] -= another_recoverer[1]
-            recoverer[2] -= another_recoverer[2]
-            recoverer[3] = (recoverer[3] - another_recoverer[3]) % self.one_sp_rec_p
+        p = self.one_sp_rec_p
+        self.recoverers_iota = [x - y for x, y in zip(self.recoverers_iota, another_l0_sampler.recoverers_iota)]
+        self.recoverers_fi = [x - y for x, y in zip(self.recoverers_fi, another_l0_sampler.recoverers_fi)]
+        self.recoverers_tau = [(x - y) % p for x, y in zip(self.recoverers_tau, another_l0_sampler.recoverers_tau)]
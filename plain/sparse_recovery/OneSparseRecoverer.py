@@ -34,19 +34,24 @@ class OneSparseRecoverer:
 
     __slots__ = 'n', 'p', 'z', 'iota', 'fi', 'tau'
 
-    def __init__(self, n):
+    def __init__(self, n, p=None):
         """
 
         Time Complexity
-            O(log(n)**4)
+            O(log(n)**4), O(1) if p is given.
 
         :param n:   Size of array.
         :type n:    int
+        :param p:   Prime greater than n, optional. The smallest prime greater than n*100 if
+                    not given. Callers creating many recoverers should find it once and pass it.
+        :type p:    int
         """
 
         self.n = n
 
-        self.p = prime_getter.get_next_prime(n*100)
+        if p is None:
+            p = prime_getter.get_next_prime(n*100)
+        self.p = p
 
         self.z = randint(1, self.p - 1)
 
@@ -84,7 +89,7 @@ class OneSparseRecoverer:
         :rtype:     (int, int) or None
         """
 
-        if self.fi != 0 and self.iota % self.fi == 0 and self.iota // self.fi > 0 and \
+        if self.fi != 0 and self.iota % self.fi == 0 and 0 < self.iota // self.fi <= self.n and \
                 self.tau == self.fi * pow(self.z, self.iota // self.fi, self.p) % self.p:
             return self.iota // self.fi - 1, self.fi
         else:
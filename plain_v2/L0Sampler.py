@@ -1,8 +1,10 @@
 import random
-from math import log, log2, ceil
+from math import log
 
 from l0_sampler.plain_v2.SparseRecoverer import SparseRecoverer
 from tools.hash_function import pick_k_ind_hash_function
+from tools.sampling import pick_random_item
+from tools.validation import check_type, check_in_range
 
 
 class L0Sampler:
@@ -29,7 +31,7 @@ class L0Sampler:
             Cormode, Graham, and Donatella Firmani. "On unifying the space of l0-sampling algorithms."
             https://pdfs.semanticscholar.org/b0f3/336c82b8a9d9a70d7cf187eea3f6dbfd1cdf.pdf
     """
-    def __init__(self, n, init_seed=None):
+    def __init__(self, n, init_seed=None, validate=False):
         """
 
         Time Complexity:
@@ -45,14 +47,19 @@ class L0Sampler:
                             initialized with the same random parameters. This holds if we initialize S1 and S2
                             consequentially setting the seed for PRG.
         :type init_seed:    int
+        :param validate:    If True, check type and range of every update. Off by default
+                            since update is the hot path.
+        :type validate:     bool
         """
 
         self.init_seed = init_seed
         if init_seed is not None:
             random.seed(init_seed)
+        self.validate = validate
 
         self.n = n
-        self.levels = ceil(log2(n))
+        # equals ceil(log2(n)) for n > 1, without floating point rounding
+        self.levels = (n - 1).bit_length()
 
         k = 4
         self.eps = 1/k
@@ -60,12 +67,13 @@ class L0Sampler:
 
         # for more accurate distribution among levels one may want to increase this value
         self.n_hash_power = 1
+        self.hash_range = self.n ** self.n_hash_power
 
         # self.sparse_degree = int(ceil(log(1 / self.eps) + log(1 / self.delta)))
         self.sparse_degree = int(2*log(k))
         self.k = self.sparse_degree >> 1
 
-        self.hash_function = pick_k_ind_hash_function(n, n ** self.n_hash_power, self.k)
+        self.hash_function = pick_k_ind_hash_function(n, self.hash_range, self.k)
 
         self.recoverers = tuple(SparseRecoverer(n, self.sparse_degree, self.delta) for i in range(self.levels))
         
@@ -84,9 +92,43 @@ class L0Sampler:
         :rtype:         None
         """
 
-        for l in range(self.levels):
-            if (self.n**self.n_hash_power) >> l > self.hash_function(i):
-                self.recoverers[l].update(i, Delta)
+        if self.validate:
+            check_type(i, int)
+            check_type(Delta, int)
+            check_in_range(0, self.n - 1, i)
+
+        # thresholds decrease with level, so updated levels form a prefix
+        hash_value = self.hash_function(i)
+        for l, recoverer in enumerate(self.recoverers):
+            if self.hash_range >> l <= hash_value:
+                break
+            recoverer.update(i, Delta)
+
+    def update_batch(self, indexes, Deltas):
+        """
+            Series of updates of type a_i += Delta, one for every pair
+            (i, Delta) from indexes and Deltas.
+
+            Updates are applied one by one with update. If one of them
+            fails validation, the updates before it stay applied.
+
+            Time Complexity
+                O(len(indexes) * log(n)**3)
+
+        :param indexes: Indexes of updates.
+        :type indexes:  sequence of int
+        :param Deltas:  Values of updates.
+        :type Deltas:   sequence of int
+        :return:
+        :rtype:         None
+        """
+
+        # checked before any update, so batch of mismatched lengths leaves the sketch unchanged
+        if len(indexes) != len(Deltas):
+            raise ValueError('indexes and Deltas must have the same length')
+
+        for i, Delta in zip(indexes, Deltas):
+            self.update(i, Delta)
 
     def _get_sample_with_min_hash(self):
         """
@@ -100,12 +142,12 @@ class L0Sampler:
         :rtype:     None or (int, int)
         """
 
-        for l in range(self.levels):
-            recover_result = self.recoverers[l].recover()
+        for recoverer in self.recoverers:
+            recover_result = recoverer.recover()
 
             if isinstance(recover_result, dict):
                 arg_min = -1
-                res_min = pow(self.n, self.n_hash_power)
+                res_min = self.hash_range
 
                 for key in recover_result:
                     hash_value = self.hash_function(key)
@@ -131,19 +173,15 @@ class L0Sampler:
 
         result = {}
 
-        for l in range(self.levels):
-            recover_result = self.recoverers[l].recover()
+        for recoverer in self.recoverers:
+            recover_result = recoverer.recover()
 
             if isinstance(recover_result, dict):
-                key = random.choice(list(recover_result.keys()))
-
-                # return key, recover_result[key]
-
-                result[key] = recover_result[key]
+                key, value = pick_random_item(recover_result)
+                result[key] = value
 
         if len(result) > 0:
-            key = random.choice(list(result.keys()))
-            return key, result[key]
+            return pick_random_item(result)
         return None
 
     def _get_info(self):
@@ -184,8 +222,8 @@ class L0Sampler:
            self.init_seed != another_l0_sampler.init_seed:
             raise ValueError('samplers are not initialized from the same random bits')
 
-        for l in range(self.levels):
-            self.recoverers[l].add_another_sketch(another_l0_sampler.recoverers[l])
+        for recoverer, another_recoverer in zip(self.recoverers, another_l0_sampler.recoverers):
+            recoverer.add(another_recoverer)
 
     def subtract(self, another_l0_sampler):
         """
@@ -209,5 +247,5 @@ class L0Sampler:
            self.init_seed != another_l0_sampler.init_seed:
             raise ValueError('samplers are not initialized from the same random bits')
 
-        for l in range(self.levels):
-            self.recoverers[l].subtract(another_l0_sampler.recoverers[l])
+        for recoverer, another_recoverer in zip(self.recoverers, another_l0_sampler.recoverers):
+            recoverer.subtract(another_recoverer)
@@ -1,7 +1,7 @@
 from math import log
 from random import randint
 
-from tools.hash_function import pick_k_ind_hash_function
+from tools.fixed_base_power import get_fixed_base_table, fixed_base_pow
 from tools.primality_test import prime_getter
 
 
@@ -35,7 +35,8 @@ class SparseRecoverer:
             https://pdfs.semanticscholar.org/b0f3/336c82b8a9d9a70d7cf187eea3f6dbfd1cdf.pdf
     """
 
-    __slots__ = 'n', 'delta', 'sparse_degree', 'columns', 'rows', 'hash_function', 'R', 'p'
+    __slots__ = 'n', 'delta', 'sparse_degree', 'columns', 'rows', 'prime_after_n', 'column_hash_params', 'p', 'z',\
+                'z_powers', 'iota', 'fi', 'tau'
 
     def __init__(self, n, s, delta):
         """
@@ -60,12 +61,25 @@ class SparseRecoverer:
         self.columns = 2*s
         self.rows = int(log(self.sparse_degree / self.delta))
 
-        self.hash_function = tuple(pick_k_ind_hash_function(n, self.columns, 2) for i in range(self.rows))
+        # rows share the prime, row l hashes i to column ((a*i + b) mod prime_after_n) mod columns,
+        # where (a, b) = column_hash_params[l]
+        self.prime_after_n = prime_getter.get_next_prime(max(n, self.columns))
+        self.column_hash_params = tuple((randint(1, self.prime_after_n - 1), randint(0, self.prime_after_n - 1))
+                                        for i in range(self.rows))
 
         self.p = prime_getter.get_next_prime(n*100)
 
-        # R[i][j] = [z, iota, fi, tau]
-        self.R = tuple(tuple([randint(1, self.p - 1), 0, 0, 0] for j in range(self.columns)) for i in range(self.rows))
+        # z is shared by all 1-sparse recoverers, so z**(i + 1) is computed once on update.
+        # Each of them still falsely reports 1-sparse vector with probability at most n/p.
+        self.z = randint(1, self.p - 1)
+        # table of powers of z, as only z**e for e <= n is needed
+        self.z_powers = get_fixed_base_table(self.z, self.p, n)
+
+        # counters of 1-sparse recoverers, one flat list per field,
+        # recoverer in row i and column j is stored at index i*columns + j
+        self.iota = [0] * (self.rows * self.columns)
+        self.fi = [0] * (self.rows * self.columns)
+        self.tau = [0] * (self.rows * self.columns)
 
     def update(self, i, Delta):
         """
@@ -82,38 +96,52 @@ class SparseRecoverer:
         :rtype:         None
         """
 
-        for l in range(self.rows):
-            recoverer = self.R[l][self.hash_function[l](i)]
-            recoverer[1] += (i + 1)*Delta
-            recoverer[2] += Delta
-            recoverer[3] = (recoverer[3] + Delta * pow(recoverer[0], i + 1, self.p)) % self.p
+        p = self.p
+        iota_delta = (i + 1)*Delta
+        tau_delta = Delta * fixed_base_pow(self.z_powers, i + 1, p)
+
+        prime_after_n = self.prime_after_n
+        columns = self.columns
+        iota = self.iota
+        fi = self.fi
+        tau = self.tau
+
+        row_offset = 0
+        for a, b in self.column_hash_params:
+            cell = row_offset + ((a*i + b) % prime_after_n) % columns
+            iota[cell] += iota_delta
+            fi[cell] += Delta
+            tau[cell] = (tau[cell] + tau_delta) % p
+            row_offset += columns
 
     def recover(self):
         """
             Iterates through every cell and tries to recover element from it.
             Recovered elements are merged into a dictionary to avoid duplicates.
+            Stops as soon as more than s elements are recovered.
 
         Time Complexity
             O(s * log(s / delta) * log(n))
 
-        :return:    If resulting dictionary is not empty returns it, otherwise
-                    returns None.
+        :return:    If resulting dictionary is not empty and contains no more
+                    than s elements returns it, otherwise returns None.
         :rtype:     dict or None
         """
 
         result = {}
-        for i in range(self.rows):
-            for j in range(self.columns):
-                recoverer = self.R[i][j]
-                z = recoverer[0]
-                iota = recoverer[1]
-                fi = recoverer[2]
-                tau = recoverer[3]
-
-                if fi != 0 and\
-                   iota % fi == 0 and iota // fi > 0 and \
-                   tau == fi * pow(z, iota // fi, self.p) % self.p:
-                    result[iota // fi - 1] = fi
+        n = self.n
+        p = self.p
+        z_powers = self.z_powers
+        sparse_degree = self.sparse_degree
+        for iota, fi, tau in zip(self.iota, self.fi, self.tau):
+            if fi != 0 and\
+               iota % fi == 0 and 0 < iota // fi <= n and \
+               tau == fi * fixed_base_pow(z_powers, iota // fi, p) % p:
+                result[iota // fi - 1] = fi
+
+                # vector is not s-sparse, no need to look at remaining cells
+                if len(result) > sparse_degree:
+                    return None
 
         if result:
             return result
@@ -154,18 +182,13 @@ class SparseRecoverer:
            self.delta != another_s_sparse_recoverer.delta or\
            self.p != another_s_sparse_recoverer.p:
             raise ValueError('s-sparse recoverers are not compatible')
+        elif self.z != another_s_sparse_recoverer.z:
+            raise ValueError('1-sparse recoverers are not compatible')
         else:
-            for i in range(self.rows):
-                for j in range(self.columns):
-                    recoverer = self.R[i][j]
-                    another_recoverer = another_s_sparse_recoverer.R[i][j]
-
-                    if recoverer[0] != another_recoverer[0]:
-                        raise ValueError('1-sparse recoverers are not compatible')
-
-                    recoverer[1] += another_recoverer[1]
-                    recoverer[2] += another_recoverer[2]
-                    recoverer[3] = (recoverer[3] + another_recoverer[3]) % self.p
+            p = self.p
+            self.iota = [x + y for x, y in zip(self.iota, another_s_sparse_recoverer.iota)]
+            self.fi = [x + y for x, y in zip(self.fi, another_s_sparse_recoverer.fi)]
+            self.tau = [(x + y) % p for x, y in zip(self.tau, another_s_sparse_recoverer.tau)]
 
     def subtract(self, another_s_sparse_recoverer):
         """
@@ -187,15 +210,10 @@ class SparseRecoverer:
            self.delta != another_s_sparse_recoverer.delta or \
            self.p != another_s_sparse_recoverer.p:
             raise ValueError('s-sparse recoverers are not compatible')
+        elif self.z != another_s_sparse_recoverer.z:
+            raise ValueError('1-sparse recoverers are not compatible')
         else:
-            for i in range(self.rows):
-                for j in range(self.columns):
-                    recoverer = self.R[i][j]
-                    another_recoverer = another_s_sparse_recoverer.R[i][j]
-
-                    if recoverer[0] != another_recoverer[0]:
-                        raise ValueError('1-sparse recoverers are not compatible')
-
-                    recoverer[1] -= another_recoverer[1]
-                    recoverer[2] -= another_recoverer[2]
-                    recoverer[3] = (recoverer[3] - another_recoverer[3]) % self.p
+            p = self.p
+            self.iota = [x - y for x, y in zip(self.iota, another_s_sparse_recoverer.iota)]
+            self.fi = [x - y for x, y in zip(self.fi, another_s_sparse_recoverer.fi)]
+            self.tau = [(x - y) % p for x, y in zip(self.tau, another_s_sparse_recoverer.tau)]
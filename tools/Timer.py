@@ -1,13 +1,19 @@
-import datetime
+import time
 
 
 class Timer:
-    time_stack = []
+    def __init__(self):
+        self.time_stack = []
 
     def start(self):
-        self.time_stack.append(datetime.datetime.now())
+        self.time_stack.append(time.perf_counter_ns())
 
     def stop(self):
-        then = self.time_stack.pop()
-        now = datetime.datetime.now()
-        return now - then
+        """
+            Returns time passed since the matching start call.
+
+        :return:    Elapsed time in nanoseconds.
+        :rtype:     int
+        """
+
+        return time.perf_counter_ns() - self.time_stack.pop()
@@ -0,0 +1,65 @@
+WINDOW_BITS = 4
+WINDOW_MASK = (1 << WINDOW_BITS) - 1
+
+
+def get_fixed_base_table(z, p, max_exponent):
+    """
+        Precomputes table for calculating z**e mod p with fixed base z
+        and any 0 <= e <= max_exponent.
+
+    :param z:               Base.
+    :type z:                int
+    :param p:               Modulus.
+    :type p:                int
+    :param max_exponent:    Largest exponent that will be used with the table.
+    :type max_exponent:     int
+    :return:                Table T, where T[k][d] = z**(d * 2**(WINDOW_BITS * k)) mod p.
+    :rtype:                 tuple
+
+    Time complexity
+        O(2**WINDOW_BITS * log(max_exponent) / WINDOW_BITS)
+
+    """
+
+    table = []
+    base = z % p
+    for k in range((max_exponent.bit_length() + WINDOW_BITS - 1) // WINDOW_BITS):
+        row = [1]
+        for d in range(WINDOW_MASK):
+            row.append(row[-1] * base % p)
+        table.append(tuple(row))
+        base = row[-1] * base % p
+
+    return tuple(table)
+
+
+def fixed_base_pow(table, e, p):
+    """
+        Calculates z**e mod p using table precomputed by get_fixed_base_table.
+
+    :param table:   Table of powers of z.
+    :type table:    tuple
+    :param e:       Exponent, 0 <= e <= max_exponent of the table.
+    :type e:        int
+    :param p:       Modulus the table was built with.
+    :type p:        int
+    :return:        z**e mod p.
+    :rtype:         int
+
+    Notes
+        Needs one multiplication per WINDOW_BITS bits of e and no squarings,
+        thus is several times faster than pow(z, e, p) for repeated calls.
+
+    Time complexity
+        O(log(e) / WINDOW_BITS)
+
+    """
+
+    result = 1
+    k = 0
+    while e:
+        result = result * table[k][e & WINDOW_MASK] % p
+        e >>= WINDOW_BITS
+        k += 1
+
+    return result
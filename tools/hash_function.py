@@ -33,12 +33,52 @@ def pick_k_ind_hash_function(n, w, k):
 
     a = tuple(random.randint(i == k - 1, p - 1) for i in range(k))
 
-    def h(x):
+    # in both variants constants are bound as default arguments, so they are read as locals
+    if k == 2:
+        # linear hash function does not need a loop
+        def h(x, a0=a[0], a1=a[1], p=p, w=w):
+            return ((a1 * x + a0) % p) % w
+
+        return h
+
+    # coefficients from a[k - 1] down to a[0] for evaluation by Horner's rule
+    a_reversed = a[::-1]
+
+    def h(x, a_reversed=a_reversed, p=p, w=w):
         res = 0
-        pow_x = 1
-        for i in range(k):
-            res = (res + pow_x * a[i]) % p
-            pow_x = (pow_x * x) % p
+        for a_i in a_reversed:
+            res = (res * x + a_i) % p
         return res % w
 
     return h
+
+
+SPLITMIX64_GAMMA = 0x9E3779B97F4A7C15
+SPLITMIX64_MASK = (1 << 64) - 1
+
+
+def splitmix64(seed, k):
+    """
+        Returns k-th output of SplitMix64 generator initialized with seed.
+
+    :param seed:    Seed of generator, only lower 64 bits are used.
+    :type seed:     int
+    :param k:       Position of output in generator's stream.
+    :type k:        int
+    :return:        Pseudorandom value from {0, ..., 2**64 - 1}.
+    :rtype:         int
+
+    Notes
+        Unlike reseeding random module, depends only on its arguments and
+        does not touch global random state, so any output can be computed
+        directly in O(1).
+
+    References
+        https://prng.di.unimi.it/splitmix64.c
+
+    """
+
+    x = (seed + (k + 1) * SPLITMIX64_GAMMA) & SPLITMIX64_MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & SPLITMIX64_MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & SPLITMIX64_MASK
+    return x ^ (x >> 31)
@@ -1,4 +1,16 @@
-from numpy.random import randint
+from random import Random
+
+
+# odd primes used to reject most composites before Miller-Rabin rounds
+SMALL_PRIMES = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+
+# Miller-Rabin with these witnesses is exact for all n < DETERMINISTIC_WITNESSES_BOUND
+DETERMINISTIC_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+DETERMINISTIC_WITNESSES_BOUND = 3317044064679887385961981
+
+# own generator for witnesses, so primality tests do not consume draws of the global random state
+_witness_random = Random()
 
 
 class PrimeGetter:
@@ -17,14 +29,16 @@ class PrimeGetter:
         :rtype:     bool
 
         Notes
-            May return True even though n is composite.
-            Probability of such event is not greater than 1 / n**2.
+            For n < 3317044064679887385961981 uses fixed witnesses and
+            the answer is exact. For larger n witnesses are random and
+            it may return True even though n is composite.
 
         Time complexity
             O(log(n)**3)
 
         References
             https://en.wikipedia.org/wiki/Miller–Rabin_primality_test
+            https://arxiv.org/abs/1509.00864
 
         """
 
@@ -33,15 +47,22 @@ class PrimeGetter:
         elif n == 1 or n % 2 == 0:
             return False
 
+        for q in SMALL_PRIMES:
+            if n % q == 0:
+                return n == q
+
         d = n - 1
         r = 0
         while d % 2 == 0:  # n - 1 = d * 2**r, d - odd
             r += 1
             d >>= 1
 
-        for i in range(r):
-            a = randint(2, n)
+        if n < DETERMINISTIC_WITNESSES_BOUND:
+            witnesses = DETERMINISTIC_WITNESSES
+        else:
+            witnesses = [_witness_random.randrange(2, n) for i in range(r)]
 
+        for a in witnesses:
             x = pow(a, d, n)  # x = (a**d) % n
 
             if x == 1 or x == n - 1:
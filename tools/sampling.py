@@ -0,0 +1,25 @@
+import random
+from itertools import islice
+
+
+def pick_random_item(d):
+    """
+        Picks uniformly random item from dictionary d.
+
+    :param d:   Non-empty dictionary to pick from.
+    :type d:    dict
+    :return:    Tuple (key, d[key]).
+    :rtype:     tuple
+
+    Notes
+        Skips to randomly chosen position of the key iterator, so unlike
+        random.choice(list(d.keys())) no list of keys is allocated.
+        Draws the same random value as random.choice would.
+
+    Time complexity
+        O(len(d))
+
+    """
+
+    key = next(islice(d, random.randrange(len(d)), None))
+    return key, d[key]
@@ -11,14 +11,8 @@ def check_type(var, *types):
     :rtype:
     """
 
-    success = False
-    for tp in types:
-        if isinstance(var, tp):
-            success = True
-            break
-
-    if not success:
-        raise TypeError('Variable must be ', types, ', found', type(var))
+    if not isinstance(var, types):
+        raise TypeError('Variable must be one of {}, found {}'.format(types, type(var)))
 
 
 def check_in_range(a, b, i):
@@ -37,4 +31,4 @@ def check_in_range(a, b, i):
     """
 
     if not (a <= i <= b):
-        raise ValueError('element', i, 'is not in range (', a, ',', b, ')')
+        raise ValueError('element {} is not in range [{}, {}]'.format(i, a, b))